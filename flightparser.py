@@ -5,14 +5,140 @@ Python Final Assignment
 """
 
 import argparse
+import calendar
 import csv
 import json
+import os
+import re
 import sys
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_DT_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2}) (\d{2}):?(\d{2})', re.ASCII)
+_PRICE_RE = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?', re.ASCII)
+
+def _parse_dt(s):
+    """Parse 'YYYY-MM-DD HHMM' or 'YYYY-MM-DD HH:MM' into a packed int
+    (YYYYMMDDHHMM) that sorts the same way as the datetime. Returns None
+    if the string is not a valid datetime in either format."""
+    m = _DT_RE.fullmatch(s) if isinstance(s, str) else None
+    if not m:
+        return None
+    year, month, day, hour, minute = map(int, m.groups())
+    if year < 1 or not 1 <= month <= 12 or hour > 23 or minute > 59:
+        return None
+    if not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return None
+    return year * 10**8 + month * 10**6 + day * 10**4 + hour * 100 + minute
+
+def _dump_json(obj, path):
+    """Write obj to path as indented JSON, using orjson when available."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2)
+
+def _dump_json_array(records, path):
+    """Write records to path as an indented JSON array one record at a
+    time, so only the record being serialized is held as encoded bytes.
+    The output matches _dump_json on the same list."""
+    if orjson is not None:
+        encode = lambda rec: orjson.dumps(rec, option=orjson.OPT_INDENT_2)
+    else:
+        encode = lambda rec: json.dumps(rec, indent=2).encode('utf-8')
+    with open(path, 'wb') as f:
+        sep = b'[\n  '
+        for rec in records:
+            f.write(sep)
+            f.write(encode(rec).replace(b'\n', b'\n  '))
+            sep = b',\n  '
+        f.write(b'[]' if sep == b'[\n  ' else b'\n]')
+
+def _load_json(path):
+    """Read JSON from path, using orjson when available."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+# condition generated for each query field; exact fields match, departure
+# is >=, arrival and price are <=
+_FILTER_CONDITIONS = {
+    'flightid': 'ids[i] == q_id',
+    'origin': 'origins[i] == q_origin',
+    'destination': 'dests[i] == q_dest',
+    'departuredatetime': 'deps[i] >= q_dep',
+    'arrivaldatetime': 'arrs[i] <= q_arr',
+    'price': 'prices[i] <= q_price',
+}
+
+@lru_cache(maxsize=None)
+def _compile_filter(fields):
+    """Generate a row filter that checks only the given query fields in a
+    single pass. Query values are passed in as arguments, never spliced
+    into the source, and there are at most 2**6 distinct filters."""
+    condition = ' and '.join(_FILTER_CONDITIONS[field] for field in fields)
+    source = (
+        'def row_filter(rows, columns, values):\n'
+        '    ids, origins, dests, deps, arrs, prices = columns\n'
+        '    q_id, q_origin, q_dest, q_dep, q_arr, q_price = values\n'
+        f'    return [i for i in rows if {condition}]\n'
+    )
+    namespace = {}
+    exec(source, namespace)
+    return namespace['row_filter']
+
+FIELDS = ('flightid', 'origin', 'destination', 'departuredatetime', 'arrivaldatetime', 'price')
+
+@dataclass(slots=True)
+class Flight:
+    flightid: str
+    origin: str
+    destination: str
+    departuredatetime: str
+    arrivaldatetime: str
+    price: str
+    # packed datetime sort keys, filled in once the datetimes are parsed
+    dep_key: int | None = None
+    arr_key: int | None = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Flight from a JSON record and parse its sort keys."""
+        flight = cls(*(data.get(field) for field in FIELDS))
+        flight.dep_key = _parse_dt(flight.departuredatetime)
+        flight.arr_key = _parse_dt(flight.arrivaldatetime)
+        return flight
+
+    def to_dict(self):
+        """The record as written to JSON, without the cached keys."""
+        return {
+            'flightid': self.flightid,
+            'origin': self.origin,
+            'destination': self.destination,
+            'departuredatetime': self.departuredatetime,
+            'arrivaldatetime': self.arrivaldatetime,
+            'price': self.price
+        }
+
 class FlightValidator:
-    ORIGIN_CODES = {'LHR', 'JFK', 'FRA', 'RIX', 'OSL', 'HEL', 'CDG', 'DXB', 'AMS', 'ARN', 'DOH', 'SYD', 'LAX', 'BRU'}
+    ORIGIN_CODES = frozenset({'LHR', 'JFK', 'FRA', 'RIX', 'OSL', 'HEL', 'CDG', 'DXB', 'AMS', 'ARN', 'DOH', 'SYD', 'LAX', 'BRU'})
+    # codes that already passed validate_code; at most 26**3 entries
+    _seen_codes = set()
     
     @staticmethod
     def validate_flightid(flight_id):
@@ -24,246 +150,352 @@ class FlightValidator:
     
     @staticmethod
     def validate_code(code):
+        if code in FlightValidator._seen_codes:
+            return True, ""
         if not code or len(code) != 3 or not code.isupper() or not code.isalpha():
             return False, ""
+        FlightValidator._seen_codes.add(code)
         return True, ""
     
     @staticmethod
     def validate_datetime(dt_str):
         if not dt_str:
             return False, "missing datetime"
-        # Accept both 2025-11-14 1030 and 2025-11-14 10:30 formats
-        for fmt in ('%Y-%m-%d %H%M', '%Y-%m-%d %H:%M'):
-            try:
-                datetime.strptime(dt_str, fmt)
-                return True, ""
-            except ValueError:
-                continue
-        return False, "invalid datetime"
+        # Accept both 2025-11-14 1030 and 2025-11-14 10:30 formats;
+        # on success the second element is the packed sort key
+        key = _parse_dt(dt_str)
+        if key is None:
+            return False, "invalid datetime"
+        return True, key
     
     @staticmethod
     def validate_price(price_str):
-        try:
-            if not price_str:
-                return False, "missing price field"
-            price = float(price_str)
-            if price < 0:
-                return False, "negative price value"
-            return True, ""
-        except ValueError:
+        if not price_str:
+            return False, "missing price field"
+        # reject malformed prices up front instead of catching ValueError
+        if not _PRICE_RE.fullmatch(price_str):
             return False, "invalid price format"
+        # only a leading minus can make the value negative
+        if price_str[0] == '-' and float(price_str) < 0:
+            return False, "negative price value"
+        return True, ""
     
     @staticmethod
-    def validate_flight_record(record, line_num):
+    def validate_flight_record(record, line_num, collect_all=False):
+        # With collect_all the message lists every failed check (used for
+        # errors.txt); otherwise stop at the first failure and run the cheap
+        # checks before the datetime ones.
         errors = []
         
-        fields = ['flightid', 'origin', 'destination', 'departuredatetime', 'arrivaldatetime', 'price']
-        for field in fields:
-            val = record.get(field)
-            if not val:
+        for field in FIELDS:
+            if not getattr(record, field):
                 errors.append(f"missing {field} field")
                 return False, ", ".join(errors)
         
-        valid, msg = FlightValidator.validate_flightid(record['flightid'])
+        valid, msg = FlightValidator.validate_flightid(record.flightid)
         if not valid:
+            if not collect_all:
+                return False, msg
             errors.append(msg)
         
-        valid, _ = FlightValidator.validate_code(record['origin'])
-        if not valid:
-            errors.append("invalid origin code")
-        elif record['origin'] not in FlightValidator.ORIGIN_CODES:
+        # every ORIGIN_CODES entry is a well-formed code, so membership alone
+        # decides validity and validate_code is not needed here
+        if record.origin not in FlightValidator.ORIGIN_CODES:
+            if not collect_all:
+                return False, "invalid origin code"
             errors.append("invalid origin code")
         
-        valid, _ = FlightValidator.validate_code(record['destination'])
+        valid, _ = FlightValidator.validate_code(record.destination)
         if not valid:
+            if not collect_all:
+                return False, "invalid destination code"
             errors.append("invalid destination code")
         
-        depart_valid, _ = FlightValidator.validate_datetime(record['departuredatetime'])
+        price_valid, price_msg = FlightValidator.validate_price(record.price)
+        if not price_valid and not collect_all:
+            return False, price_msg
+        
+        depart_valid, dep_key = FlightValidator.validate_datetime(record.departuredatetime)
         if not depart_valid:
+            if not collect_all:
+                return False, "invalid departure datetime"
             errors.append("invalid departure datetime")
         
-        arrive_valid, _ = FlightValidator.validate_datetime(record['arrivaldatetime'])
+        arrive_valid, arr_key = FlightValidator.validate_datetime(record.arrivaldatetime)
         if not arrive_valid:
+            if not collect_all:
+                return False, "invalid arrival datetime"
             errors.append("invalid arrival datetime")
         
-        if depart_valid and arrive_valid:
-            depart_dt = datetime.strptime(record['departuredatetime'], '%Y-%m-%d %H%M')
-            arrive_dt = datetime.strptime(record['arrivaldatetime'], '%Y-%m-%d %H%M')
-            if arrive_dt <= depart_dt:
-                errors.append("arrival before departure")
+        if depart_valid and arrive_valid and arr_key <= dep_key:
+            errors.append("arrival before departure")
         
-        valid, msg = FlightValidator.validate_price(record['price'])
-        if not valid:
-            errors.append(msg)
+        if not price_valid:
+            errors.append(price_msg)
         
-        return len(errors) == 0, ", ".join(errors) if errors else ""
+        if errors:
+            return False, ", ".join(errors)
+        # cache the sort keys so queries never re-parse the datetimes
+        record.dep_key = dep_key
+        record.arr_key = arr_key
+        return True, ""
 
 class FlightParser:
-    def __init__(self):
+    def __init__(self, collect_all_errors=True):
         self.valid_flights = []
+        # report every failed check per line (as errors.txt expects) rather
+        # than just the first one
+        self.collect_all_errors = collect_all_errors
         # store tuples: (line_num, raw_line, message)
         self.error_lines = []
+        # query columns, rebuilt when valid_flights changes size
+        self._columns_len = None
+        # query_path -> (mtime_ns, pre-parsed queries)
+        self._query_cache = {}
     
     def parse_csv(self, filepath):
+        # bind hot-loop lookups to locals once per file
+        add_valid = self.valid_flights.append
+        add_error = self.error_lines.append
+        validate = FlightValidator.validate_flight_record
+        collect_all = self.collect_all_errors
+        # airport codes repeat heavily, so share one string object per code
+        intern = sys.intern
         try:
+            # read and decode the whole file in one call, then split it
             with open(filepath, 'r', encoding='utf-8') as f:
-                header_seen = False
-                for line_num, raw in enumerate(f, start=1):
-                    raw_line = raw.rstrip('\n')
-                    if not raw_line.strip():
-                        continue
-                    # comment lines start with '#'
-                    if raw_line.lstrip().startswith('#'):
-                        self.error_lines.append((line_num, raw_line, 'comment line, ignored for data parsing'))
-                        continue
-                    # header detection
-                    if not header_seen and raw_line.lower().startswith('flightid'):
-                        header_seen = True
-                        continue
+                lines = f.read().split('\n')
+            header_seen = False
+            for line_num, raw_line in enumerate(lines, start=1):
+                stripped = raw_line.lstrip()
+                if not stripped:
+                    continue
+                # comment lines start with '#'
+                if stripped[0] == '#':
+                    add_error((line_num, raw_line, 'comment line, ignored for data parsing'))
+                    continue
+                # header detection; lowercase only the prefix, not the line
+                if not header_seen and raw_line[:8].lower() == 'flightid':
+                    header_seen = True
+                    continue
 
-                    # parse CSV row from the raw line
+                # parse CSV row from the raw line; a plain split is enough
+                # unless the line uses quoting
+                if '"' not in raw_line:
+                    values = raw_line.split(',')
+                else:
                     try:
                         values = next(csv.reader([raw_line]))
                     except Exception:
-                        self.error_lines.append((line_num, raw_line, 'malformed CSV line'))
+                        add_error((line_num, raw_line, 'malformed CSV line'))
                         continue
 
-                    if len(values) < 6:
-                        self.error_lines.append((line_num, raw_line, 'missing required fields'))
-                        continue
+                if len(values) < 6:
+                    add_error((line_num, raw_line, 'missing required fields'))
+                    continue
 
-                    record = {
-                        'flightid': values[0].strip(),
-                        'origin': values[1].strip(),
-                        'destination': values[2].strip(),
-                        'departuredatetime': values[3].strip(),
-                        'arrivaldatetime': values[4].strip(),
-                        'price': values[5].strip()
-                    }
+                record = Flight(
+                    values[0].strip(),
+                    intern(values[1].strip()),
+                    intern(values[2].strip()),
+                    values[3].strip(),
+                    values[4].strip(),
+                    values[5].strip()
+                )
 
-                    valid, errors = FlightValidator.validate_flight_record(record, line_num)
-                    if valid:
-                        self.valid_flights.append(record)
-                    else:
-                        self.error_lines.append((line_num, raw_line, errors))
+                valid, errors = validate(record, line_num, collect_all)
+                if valid:
+                    add_valid(record)
+                else:
+                    add_error((line_num, raw_line, errors))
         except Exception as e:
             print(f"Error reading file {filepath}: {e}", file=sys.stderr)
     
     def parse_directory(self, dirpath):
         path = Path(dirpath)
-        for csv_file in sorted(path.glob('*.csv')):
-            self.parse_csv(str(csv_file))
+        csv_files = [str(csv_file) for csv_file in sorted(path.glob('*.csv'))]
+        if len(csv_files) < 2:
+            for csv_file in csv_files:
+                self.parse_csv(csv_file)
+            return
+        # files are independent, so parse them in parallel and merge in order
+        with ProcessPoolExecutor() as executor:
+            for valid, errors in executor.map(_parse_csv_worker, csv_files,
+                                              repeat(self.collect_all_errors)):
+                self.valid_flights.extend(valid)
+                self.error_lines.extend(errors)
     
     def export_valid_flights(self, output_path):
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.valid_flights, f, indent=2)
+        _dump_json_array((f.to_dict() for f in self.valid_flights), output_path)
     
     def export_errors(self, output_path):
+        # join the lines in chunks so large error sets need few write calls
+        # without building the whole file in memory
+        chunk = 10000
         with open(output_path, 'w', encoding='utf-8') as f:
-            for line_num, raw_line, message in self.error_lines:
-                f.write(f"Line {line_num}: {raw_line} → {message}\n")
+            for start in range(0, len(self.error_lines), chunk):
+                f.write(''.join(f"Line {line_num}: {raw_line} → {message}\n"
+                                for line_num, raw_line, message in self.error_lines[start:start + chunk]))
     
     def load_json_database(self, filepath):
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                self.valid_flights = json.load(f)
+            self.valid_flights = [Flight.from_dict(d) for d in _load_json(filepath)]
+            self._columns_len = None
         except Exception as e:
             print(f"Error loading JSON file {filepath}: {e}", file=sys.stderr)
             sys.exit(1)
     
-    def query_flights(self, query):
-        results = []
-        for flight in self.valid_flights:
-            match = True
-            if 'flightid' in query and flight['flightid'] != query['flightid']:
-                match = False
-            if 'origin' in query and flight['origin'] != query['origin']:
-                match = False
-            if 'destination' in query and flight['destination'] != query['destination']:
-                match = False
-            # departure >= given value
-            if 'departuredatetime' in query:
-                qdt = query['departuredatetime']
-                try:
-                    q_dt = None
-                    for fmt in ('%Y-%m-%d %H%M', '%Y-%m-%d %H:%M'):
-                        try:
-                            q_dt = datetime.strptime(qdt, fmt)
-                            break
-                        except ValueError:
-                            continue
-                    if q_dt is None:
-                        match = False
-                    else:
-                        # parse flight dt
-                        f_dt = None
-                        for fmt in ('%Y-%m-%d %H%M', '%Y-%m-%d %H:%M'):
-                            try:
-                                f_dt = datetime.strptime(flight['departuredatetime'], fmt)
-                                break
-                            except ValueError:
-                                continue
-                        if f_dt is None or f_dt < q_dt:
-                            match = False
-                except Exception:
-                    match = False
+    def _build_columns(self):
+        """Rebuild the per-field columns used by query_flights. Datetimes
+        and prices are pre-parsed; unparseable values get sentinels that
+        never satisfy a filter."""
+        flights = self.valid_flights
+        self._col_flightid = [f.flightid for f in flights]
+        self._col_origin = [f.origin for f in flights]
+        self._col_dest = [f.destination for f in flights]
+        # value -> row indices for the exact-match fields
+        self._id_index = {}
+        self._origin_index = {}
+        self._dest_index = {}
+        for i in range(len(flights)):
+            self._id_index.setdefault(self._col_flightid[i], []).append(i)
+            self._origin_index.setdefault(self._col_origin[i], []).append(i)
+            self._dest_index.setdefault(self._col_dest[i], []).append(i)
+        dep, arr, price = array('q'), array('q'), array('d')
+        for f in flights:
+            key = f.dep_key
+            if key is None:
+                key = _parse_dt(f.departuredatetime)
+            dep.append(-1 if key is None else key)
+            key = f.arr_key
+            if key is None:
+                key = _parse_dt(f.arrivaldatetime)
+            arr.append(10**12 if key is None else key)
+            try:
+                price.append(float(f.price))
+            except (TypeError, ValueError):
+                price.append(float('nan'))
+        self._col_dep, self._col_arr, self._col_price = dep, arr, price
+        # rows ordered by departure so range filters can bisect
+        self._dep_order = sorted(range(len(flights)), key=dep.__getitem__)
+        self._dep_keys = array('q', [dep[i] for i in self._dep_order])
+        self._columns_len = len(flights)
 
-            # arrival <= given value
-            if 'arrivaldatetime' in query:
-                qdt = query['arrivaldatetime']
-                try:
-                    q_dt = None
-                    for fmt in ('%Y-%m-%d %H%M', '%Y-%m-%d %H:%M'):
-                        try:
-                            q_dt = datetime.strptime(qdt, fmt)
-                            break
-                        except ValueError:
-                            continue
-                    if q_dt is None:
-                        match = False
-                    else:
-                        f_dt = None
-                        for fmt in ('%Y-%m-%d %H%M', '%Y-%m-%d %H:%M'):
-                            try:
-                                f_dt = datetime.strptime(flight['arrivaldatetime'], fmt)
-                                break
-                            except ValueError:
-                                continue
-                        if f_dt is None or f_dt > q_dt:
-                            match = False
-                except Exception:
-                    match = False
+    @staticmethod
+    def _prepare_query(query):
+        """Parse the range filters of a query once: returns the packed
+        departure/arrival keys and price limit (None where absent), or None
+        if a filter value is malformed and the query can match nothing."""
+        q_dep = q_arr = q_price = None
+        if 'departuredatetime' in query:
+            q_dep = _parse_dt(query['departuredatetime'])
+            if q_dep is None:
+                return None
+        if 'arrivaldatetime' in query:
+            q_arr = _parse_dt(query['arrivaldatetime'])
+            if q_arr is None:
+                return None
+        if 'price' in query:
+            try:
+                q_price = float(query['price'])
+            except ValueError:
+                return None
+        return q_dep, q_arr, q_price
 
-            # price <= given value
-            if 'price' in query:
+    def query_flights(self, query, prepared=False):
+        if prepared is False:
+            prepared = self._prepare_query(query)
+        if prepared is None:
+            return []
+        q_dep, q_arr, q_price = prepared
+        if self._columns_len != len(self.valid_flights):
+            self._build_columns()
+
+        # start from the smallest candidate set: an exact-match index hit or
+        # the departure range, then check the remaining filters in one pass
+        rows = range(len(self.valid_flights))
+        exact = [('flightid', self._id_index), ('origin', self._origin_index),
+                 ('destination', self._dest_index)]
+        exact = [(field, index) for field, index in exact if field in query]
+        remaining = [field for field, _ in exact]
+        if exact:
+            hits = []
+            for field, index in exact:
                 try:
-                    query_price = float(query['price'])
-                    flight_price = float(flight['price'])
-                    if flight_price > query_price:
-                        match = False
-                except ValueError:
-                    match = False
-            if match:
-                results.append(flight)
-        return results
+                    hits.append(index.get(query[field], []))
+                except TypeError:
+                    # unhashable query value, cannot match anything
+                    hits.append([])
+            smallest = min(range(len(hits)), key=lambda k: len(hits[k]))
+            rows = hits[smallest]
+            del remaining[smallest]
+        if q_dep is not None:
+            lo = bisect_left(self._dep_keys, q_dep)
+            if len(self._dep_keys) - lo < len(rows):
+                rows = sorted(self._dep_order[lo:])
+                remaining = [field for field, _ in exact]
+            else:
+                remaining.append('departuredatetime')
+        if q_arr is not None:
+            remaining.append('arrivaldatetime')
+        if q_price is not None:
+            remaining.append('price')
+        if remaining:
+            columns = (self._col_flightid, self._col_origin, self._col_dest,
+                       self._col_dep, self._col_arr, self._col_price)
+            values = (query.get('flightid'), query.get('origin'), query.get('destination'),
+                      q_dep, q_arr, q_price)
+            rows = _compile_filter(tuple(remaining))(rows, columns, values)
+        flights = self.valid_flights
+        return [flights[i] for i in rows]
     
+    def _load_queries(self, query_path):
+        """Load and pre-parse a query file, reusing the cached result while
+        the file's mtime is unchanged. Returns (query, dedupe key, prepared
+        filters) tuples."""
+        mtime = os.stat(query_path).st_mtime_ns
+        cached = self._query_cache.get(query_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        queries_data = _load_json(query_path)
+        if isinstance(queries_data, dict):
+            queries = [queries_data]
+        else:
+            queries = queries_data
+        loaded = [(query, json.dumps(query, sort_keys=True), self._prepare_query(query))
+                  for query in queries]
+        self._query_cache[query_path] = (mtime, loaded)
+        return loaded
+
     def execute_queries(self, query_path):
         try:
-            with open(query_path, 'r', encoding='utf-8') as f:
-                queries_data = json.load(f)
-            if isinstance(queries_data, dict):
-                queries = [queries_data]
-            else:
-                queries = queries_data
             results = []
-            for query in queries:
-                matches = self.query_flights(query)
+            # evaluate each distinct query once per batch, and convert each
+            # matched record once however many queries it matches
+            matches_by_query = {}
+            as_dicts = {}
+            for query, key, prepared in self._load_queries(query_path):
+                matches = matches_by_query.get(key)
+                if matches is None:
+                    matches = []
+                    for flight in self.query_flights(query, prepared):
+                        as_dict = as_dicts.get(id(flight))
+                        if as_dict is None:
+                            as_dict = as_dicts[id(flight)] = flight.to_dict()
+                        matches.append(as_dict)
+                    matches_by_query[key] = matches
                 results.append({'query': query, 'matches': matches})
             return results
         except Exception as e:
             print(f"Error executing queries from {query_path}: {e}", file=sys.stderr)
             sys.exit(1)
 
+def _parse_csv_worker(filepath, collect_all_errors=True):
+    """Parse one CSV file in a worker process for parse_directory."""
+    flight_parser = FlightParser(collect_all_errors)
+    flight_parser.parse_csv(filepath)
+    return flight_parser.valid_flights, flight_parser.error_lines
+
 def main():
     parser = argparse.ArgumentParser(description='Flight Schedule Parser and Query Tool', prog='flightparser.py')
     parser.add_argument('-i', '--input', help='Parse a single CSV file')
@@ -300,8 +532,7 @@ def main():
         lname = 'Tushir'
         ts = datetime.now().strftime('%Y%m%d_%H%M')
         response_filename = f'response_{sid}_{fname}_{lname}_{ts}.json'
-        with open(response_filename, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2)
+        _dump_json(results, response_filename)
         print(f"Query results saved to {response_filename}")
     
     print("Processing complete.")